@@ -1,114 +1,296 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
+import argparse
+import os
+import tempfile
+
 import numpy as np
+import pandas as pd
+import pyarrow as pa
+from scipy.stats.distributions import chi2
+
+CSV_PATH = 'aerofit_treadmill_data.csv'
+CACHE_PATH = 'aerofit.parquet'
+
+# PNG output is dominated by zlib; trade a little file size for much faster writes
+SAVEFIG_KWARGS = {'dpi': 90, 'pil_kwargs': {'compress_level': 1}}
+
+
+def box_stats(values, quartiles, label):
+    """Build one ``Axes.bxp`` box from precomputed quartiles (1.5 IQR whiskers)."""
+    q1, med, q3 = quartiles
+    reach = 1.5 * (q3 - q1)
+    inside = (values >= q1 - reach) & (values <= q3 + reach)
+    return {
+        'label': label,
+        'q1': q1,
+        'med': med,
+        'q3': q3,
+        'whislo': values[inside].min(),
+        'whishi': values[inside].max(),
+        'fliers': values[~inside]
+    }
+
+
+def chi2_p(table):
+    """Chi-square independence p-value for a contingency table.
+
+    Equivalent to ``scipy.stats.chi2_contingency`` for tables with more than one
+    degree of freedom, where no continuity correction is applied.
+    """
+    observed = np.asarray(table, dtype=np.float64)
+    expected = observed.sum(axis=1, keepdims=True) * observed.sum(axis=0) / observed.sum()
+    statistic = ((observed - expected) ** 2 / expected).sum()
+    dof = (observed.shape[0] - 1) * (observed.shape[1] - 1)
+    return chi2.sf(statistic, dof)
+
+
+def group_means(codes, values, n_groups):
+    """Per-group column means of a 2-D array, accumulated in one pass over the rows."""
+    sums = np.zeros((n_groups, values.shape[1]))
+    np.add.at(sums, codes, values)
+    return sums / np.bincount(codes, minlength=n_groups)[:, None]
+
+
+def fast_ct(a, b):
+    """Contingency table of two categorical Series, counted with ``np.add.at`` on their codes."""
+    counts = np.zeros((len(a.cat.categories), len(b.cat.categories)), dtype=np.int64)
+    np.add.at(counts, (a.cat.codes.to_numpy(), b.cat.codes.to_numpy()), 1)
+    return pd.DataFrame(
+        counts,
+        index=a.cat.categories.rename(a.name),
+        columns=b.cat.categories.rename(b.name)
+    )
+
+
+LABEL_COLUMNS = ('Product', 'Gender', 'MaritalStatus')
+UNSIGNED_COLUMNS = ('Age', 'Education', 'Usage', 'Fitness', 'Miles')
+
+
+def read_cache():
+    """Return the Parquet cache, or None when it must be rebuilt from the CSV.
+
+    The cache is rebuilt when it is missing, older than the CSV, unreadable
+    (e.g. truncated by an interrupted write) or stored with other dtypes than
+    ``load_data`` produces.
+    """
+    if not os.path.exists(CACHE_PATH):
+        return None
+    if os.path.exists(CSV_PATH) and os.path.getmtime(CACHE_PATH) < os.path.getmtime(CSV_PATH):
+        return None
+    try:
+        df = pd.read_parquet(CACHE_PATH)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    try:
+        typed = (
+            all(isinstance(df[col].dtype, pd.CategoricalDtype) for col in LABEL_COLUMNS)
+            and all(df[col].dtype.kind == 'u' for col in UNSIGNED_COLUMNS)
+            and df['Income'].dtype.kind == 'i' and df['Income'].dtype.itemsize < 8
+        )
+    except KeyError:
+        return None
+    return df if typed else None
+
+
+def write_cache(df):
+    """Write the Parquet cache atomically; on failure the frame is simply not cached.
+
+    The file is written next to the cache and moved into place, so an
+    interrupted write never leaves a truncated file under ``CACHE_PATH``.
+    """
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=CACHE_PATH + '.', suffix='.tmp', dir=os.path.dirname(os.path.abspath(CACHE_PATH))
+        )
+        with os.fdopen(fd, 'wb') as f:
+            df.to_parquet(f, compression='zstd')
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_data(refresh=False):
+    """Load the treadmill data, using the typed Parquet cache when it is current.
+
+    The cache keeps the category and downcast integer dtypes, so later runs
+    skip CSV parsing entirely. ``refresh`` rebuilds it from the CSV regardless.
+    """
+    if not refresh:
+        df = read_cache()
+        if df is not None:
+            return df
+
+    # pyarrow engine parses the CSV multithreaded
+    df = pd.read_csv(CSV_PATH, engine='pyarrow')
+
+    # Low-cardinality labels are grouped on repeatedly; store them as categories
+    for col in LABEL_COLUMNS:
+        df[col] = df[col].astype('category')
+
+    # Every numeric column is a small non-negative integer; Income needs 32 bits
+    for col in UNSIGNED_COLUMNS:
+        df[col] = pd.to_numeric(df[col], downcast='unsigned')
+    df['Income'] = pd.to_numeric(df['Income'], downcast='integer')
+
+    write_cache(df)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AeroFit treadmill customer analysis')
+    parser.add_argument('--refresh', action='store_true',
+                        help='re-read the CSV and rebuild the Parquet cache')
+    args = parser.parse_args()
+
+    df = load_data(refresh=args.refresh)
+
+    # 1. Basic Data Analysis
+    print("\n=== Basic Data Overview ===")
+    print(f"{len(df)} rows x {df.shape[1]} columns, "
+          f"{df.memory_usage(deep=True).sum() / 1024:.1f} KB in memory")
+    print(df.dtypes)
+
+    # The numeric columns and product codes are extracted once and shared by the
+    # summary, demographics and correlation sections below
+    numeric_cols = ['Age', 'Education', 'Usage', 'Fitness', 'Income', 'Miles']
+    numeric_block = df[numeric_cols].to_numpy(dtype=np.float64)
+    product_codes = df['Product'].cat.codes.to_numpy()
+    products = df['Product'].cat.categories
+
+    print("\nSummary Statistics:")
+    summary = pd.DataFrame(
+        np.vstack([
+            np.count_nonzero(~np.isnan(numeric_block), axis=0),
+            numeric_block.mean(axis=0),
+            numeric_block.std(axis=0, ddof=1),
+            numeric_block.min(axis=0),
+            np.quantile(numeric_block, [0.25, 0.5, 0.75], axis=0),
+            numeric_block.max(axis=0)
+        ]),
+        index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+        columns=numeric_cols
+    )
+    print(summary)
+
+    # 2. Customer Demographics by Product
+    print("\n=== Customer Demographics by Product ===")
+
+    # Average metrics by product, from one pass over the numeric block
+    demographic_cols = ['Age', 'Education', 'Income', 'Usage', 'Fitness', 'Miles']
+    demographics = pd.DataFrame(
+        group_means(product_codes, numeric_block, len(products)),
+        index=products.rename('Product'),
+        columns=numeric_cols
+    )[demographic_cols]
+
+    print("\nAverage Customer Metrics by Product:")
+    print(demographics.round(2))
+
+    # 3. Visualizations
+    # Plotting libraries are only needed from here on, so import them lazily
+    import matplotlib
+    matplotlib.use('Agg')  # figures are only written to disk; skip GUI backends
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Set the style for better visualizations
+    plt.style.use('seaborn')
+    sns.set_palette("husl")
+
+    # Box plots of the key metrics by product. Quartiles for all four metrics
+    # are computed in one np.quantile pass per product and drawn with bxp.
+    box_titles = {
+        'Age': 'Age Distribution by Product',
+        'Income': 'Income Distribution by Product',
+        'Fitness': 'Fitness Level by Product',
+        'Usage': 'Weekly Usage by Product'
+    }
+    box_blocks = {
+        product: block.to_numpy()
+        for product, block in df.groupby('Product', observed=True)[list(box_titles)]
+    }
+    box_quartiles = {
+        product: np.quantile(block, [0.25, 0.5, 0.75], axis=0)
+        for product, block in box_blocks.items()
+    }
+
+    fig, axes = plt.subplots(2, 2, figsize=(15, 10), constrained_layout=True)
+    for i, (ax, (metric, title)) in enumerate(zip(axes.flat, box_titles.items())):
+        ax.bxp(
+            [box_stats(box_blocks[p][:, i], box_quartiles[p][:, i], p) for p in box_blocks],
+            patch_artist=True,
+            boxprops={'facecolor': sns.color_palette()[0]}
+        )
+        ax.set_title(title)
+        ax.set_xlabel('Product')
+        ax.set_ylabel(metric)
+
+    fig.savefig('product_distributions.png', **SAVEFIG_KWARGS)
+    plt.close(fig)
+
+    # Gender Distribution (the counts are reused for the chi-square test below)
+    gender_table = fast_ct(df['Product'], df['Gender'])
+    gender_product = gender_table.div(gender_table.sum(axis=1), axis=0) * 100
+    fig, ax = plt.subplots(figsize=(10, 6), constrained_layout=True)
+    gender_product.plot(kind='bar', stacked=True, ax=ax)
+    ax.set_title('Gender Distribution by Product (%)')
+    ax.set_ylabel('Percentage')
+    fig.savefig('gender_distribution.png', **SAVEFIG_KWARGS)
+    plt.close(fig)
+
+    # 4. Contingency Tables and Chi-Square Tests
+    print("\n=== Contingency Tables and Statistical Tests ===")
+
+    # Product vs Gender
+    print("\nProduct vs Gender Contingency Table:")
+    print(gender_table)
+    print(f"Chi-square p-value: {chi2_p(gender_table.to_numpy()):.4f}")
+
+    # Product vs MaritalStatus
+    marital_table = fast_ct(df['Product'], df['MaritalStatus'])
+    print("\nProduct vs Marital Status Contingency Table:")
+    print(marital_table)
+    print(f"Chi-square p-value: {chi2_p(marital_table.to_numpy()):.4f}")
+
+    # 5. Correlation Analysis
+    print("\n=== Correlation Analysis ===")
+    # One corrcoef call over the shared block instead of pandas' pairwise dispatch
+    correlation = pd.DataFrame(
+        np.corrcoef(numeric_block, rowvar=False),
+        index=numeric_cols,
+        columns=numeric_cols
+    )
+
+    # Drawn as a single image plus one text label per cell
+    fig, ax = plt.subplots(figsize=(10, 8), constrained_layout=True)
+    im = ax.imshow(correlation.to_numpy(), cmap='coolwarm', vmin=-1, vmax=1)
+    ax.set_xticks(range(len(numeric_cols)), numeric_cols)
+    ax.set_yticks(range(len(numeric_cols)), numeric_cols)
+    ax.grid(False)
+    for (i, j), value in np.ndenumerate(correlation.to_numpy()):
+        ax.text(j, i, f'{value:.2f}', ha='center', va='center',
+                color='white' if abs(value) > 0.6 else 'black')
+    fig.colorbar(im, ax=ax)
+    ax.set_title('Correlation Matrix of Numeric Variables')
+    fig.savefig('correlation_matrix.png', **SAVEFIG_KWARGS)
+    plt.close(fig)
+
+    # 6. Product Profiles
+    # Reuse the section 2 aggregates and the gender split from section 3 and
+    # print all profiles as one formatted table.
+    print("\n=== Product Profiles ===")
+    profile_report = demographics[['Age', 'Income', 'Fitness', 'Usage', 'Miles']].assign(
+        GenderSplit=pd.Series(gender_product.round(1).to_dict('index'))
+    )
+    print(profile_report.to_string(formatters={
+        'Age': '{:.1f} years'.format,
+        'Income': '${:,.2f}'.format,
+        'Fitness': '{:.1f}'.format,
+        'Usage': '{:.1f} times'.format,
+        'Miles': '{:.1f}'.format
+    }))
+
 
-# Set the style for better visualizations
-plt.style.use('seaborn')
-sns.set_palette("husl")
-
-# Read the data
-df = pd.read_csv('aerofit_treadmill_data.csv')
-
-# 1. Basic Data Analysis
-print("\n=== Basic Data Overview ===")
-print(df.info())
-print("\nSummary Statistics:")
-print(df.describe())
-
-# 2. Customer Demographics by Product
-print("\n=== Customer Demographics by Product ===")
-
-# Average metrics by product
-demographics = df.groupby('Product').agg({
-    'Age': 'mean',
-    'Education': 'mean',
-    'Income': 'mean',
-    'Usage': 'mean',
-    'Fitness': 'mean',
-    'Miles': 'mean'
-}).round(2)
-
-print("\nAverage Customer Metrics by Product:")
-print(demographics)
-
-# 3. Visualizations
-
-# Create a figure with subplots
-plt.figure(figsize=(15, 10))
-
-# Age Distribution by Product
-plt.subplot(2, 2, 1)
-sns.boxplot(x='Product', y='Age', data=df)
-plt.title('Age Distribution by Product')
-
-# Income Distribution by Product
-plt.subplot(2, 2, 2)
-sns.boxplot(x='Product', y='Income', data=df)
-plt.title('Income Distribution by Product')
-
-# Fitness Level by Product
-plt.subplot(2, 2, 3)
-sns.boxplot(x='Product', y='Fitness', data=df)
-plt.title('Fitness Level by Product')
-
-# Usage by Product
-plt.subplot(2, 2, 4)
-sns.boxplot(x='Product', y='Usage', data=df)
-plt.title('Weekly Usage by Product')
-
-plt.tight_layout()
-plt.savefig('product_distributions.png')
-plt.close()
-
-# Gender Distribution
-plt.figure(figsize=(10, 6))
-gender_product = pd.crosstab(df['Product'], df['Gender'], normalize='index') * 100
-gender_product.plot(kind='bar', stacked=True)
-plt.title('Gender Distribution by Product (%)')
-plt.ylabel('Percentage')
-plt.tight_layout()
-plt.savefig('gender_distribution.png')
-plt.close()
-
-# 4. Contingency Tables and Chi-Square Tests
-print("\n=== Contingency Tables and Statistical Tests ===")
-
-# Product vs Gender
-gender_table = pd.crosstab(df['Product'], df['Gender'])
-print("\nProduct vs Gender Contingency Table:")
-print(gender_table)
-chi2, p_value = stats.chi2_contingency(gender_table)[:2]
-print(f"Chi-square p-value: {p_value:.4f}")
-
-# Product vs MaritalStatus
-marital_table = pd.crosstab(df['Product'], df['MaritalStatus'])
-print("\nProduct vs Marital Status Contingency Table:")
-print(marital_table)
-chi2, p_value = stats.chi2_contingency(marital_table)[:2]
-print(f"Chi-square p-value: {p_value:.4f}")
-
-# 5. Correlation Analysis
-print("\n=== Correlation Analysis ===")
-numeric_cols = ['Age', 'Education', 'Usage', 'Fitness', 'Income', 'Miles']
-correlation = df[numeric_cols].corr()
-
-plt.figure(figsize=(10, 8))
-sns.heatmap(correlation, annot=True, cmap='coolwarm', center=0)
-plt.title('Correlation Matrix of Numeric Variables')
-plt.tight_layout()
-plt.savefig('correlation_matrix.png')
-plt.close()
-
-# 6. Product Profiles
-print("\n=== Product Profiles ===")
-for product in df['Product'].unique():
-    product_data = df[df['Product'] == product]
-    print(f"\nProfile for {product}:")
-    print(f"Average Age: {product_data['Age'].mean():.1f} years")
-    print(f"Average Income: ${product_data['Income'].mean():,.2f}")
-    print(f"Average Fitness Level: {product_data['Fitness'].mean():.1f}")
-    print(f"Average Weekly Usage: {product_data['Usage'].mean():.1f} times")
-    print(f"Average Weekly Miles: {product_data['Miles'].mean():.1f}")
-    print(f"Gender Split: {(product_data['Gender'].value_counts(normalize=True) * 100).round(1).to_dict()}")
+if __name__ == '__main__':
+    main()
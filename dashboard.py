@@ -1,9 +1,14 @@
+import copy
+import os
+import tempfile
+from typing import NamedTuple
+
 import streamlit as st
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 import plotly.express as px
 import plotly.graph_objects as go
-from scipy import stats
 
 # Page config
 st.set_page_config(
@@ -24,136 +29,245 @@ COLORS = {
     'grid': '#2D3748'
 }
 
-# Custom CSS
-st.markdown("""
-<style>
-    /* Main Layout */
-    .main {
-        background-color: #0E1117;
-    }
-    
-    /* Cards */
-    .stCard {
-        background-color: #1E1E1E;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border: 1px solid rgba(255, 255, 255, 0.1);
-    }
-    
-    /* Text */
-    h1, h2, h3, p {
-        color: #FFFFFF !important;
-    }
-    
-    .metric-card {
-        background: linear-gradient(45deg, #1E1E1E, #2D3748);
-        border-radius: 0.5rem;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        border: 1px solid rgba(74, 144, 226, 0.3);
-    }
-    
-    .metric-value {
-        font-size: 1.5rem;
-        font-weight: bold;
-        color: #4A90E2;
-    }
-    
-    .metric-label {
-        color: #A0AEC0;
-        font-size: 0.875rem;
-    }
-    
-    /* Plotly chart background */
-    .js-plotly-plot {
-        background-color: #1E1E1E !important;
-    }
-    
-    /* Sidebar */
-    [data-testid="stSidebar"] {
-        background-color: #1E1E1E;
-        border-right: 1px solid rgba(255, 255, 255, 0.1);
-    }
-    
-    /* Radio buttons */
-    .stRadio > label {
-        color: #FFFFFF !important;
-    }
-    
-    /* Insights box */
-    .insight-box {
-        background: linear-gradient(45deg, #1E1E1E, #2D3748);
-        border-radius: 0.5rem;
-        padding: 1rem;
-        margin: 1rem 0;
-        border-left: 4px solid #4A90E2;
-    }
-    
-    /* Tables */
-    .dataframe {
-        background-color: #1E1E1E !important;
-        color: #FFFFFF !important;
-    }
-    
-    .dataframe th {
-        background-color: #2D3748 !important;
-        color: #FFFFFF !important;
-    }
-    
-    .dataframe td {
-        color: #FFFFFF !important;
-    }
-    
-    /* Plot area */
-    .plot-container {
-        background-color: #1E1E1E !important;
-        border-radius: 0.5rem;
-        padding: 1rem;
-        border: 1px solid rgba(255, 255, 255, 0.1);
-    }
-</style>
-""", unsafe_allow_html=True)
+# Custom CSS, kept in dashboard.css and read from disk once per process
+CSS_PATH = 'dashboard.css'
 
-# Configure plotly theme
+@st.cache_resource
+def load_css():
+    with open(CSS_PATH) as f:
+        return '<style>\n' + f.read() + '</style>'
+
+# Re-emitted on every run: Streamlit drops page elements a rerun does not
+# produce, so injecting the styles only once would lose them after the
+# first interaction
+st.markdown(load_css(), unsafe_allow_html=True)
+
+# Configure plotly theme. custom_dark is a copy, so the stock plotly_dark
+# template is left untouched.
 import plotly.io as pio
-template = pio.templates["plotly_dark"]
+template = copy.deepcopy(pio.templates["plotly_dark"])
 template.layout.update(
     paper_bgcolor=COLORS['card'],
     plot_bgcolor=COLORS['card'],
-    font_color=COLORS['text']
+    font_color=COLORS['text'],
+    title_font_color=COLORS['text'],
+    legend_font_color=COLORS['text']
 )
-template.layout.xaxis.update(gridcolor=COLORS['grid'])
-template.layout.yaxis.update(gridcolor=COLORS['grid'])
+for axis in (template.layout.xaxis, template.layout.yaxis):
+    axis.update(gridcolor=COLORS['grid'], zerolinecolor=COLORS['grid'], tickfont_color=COLORS['text'])
 pio.templates["custom_dark"] = template
 pio.templates.default = "custom_dark"
 
 # Cache the data loading
+CSV_PATH = 'aerofit_treadmill_data.csv'
+# Bump CACHE_VERSION whenever the CSV is parsed differently in a way the dtypes
+# do not show (v2: pyarrow engine, int16 Miles); old cache files are then ignored
+CACHE_VERSION = 2
+CACHE_PATH = f'aerofit_dashboard.v{CACHE_VERSION}.parquet'
+
+# Narrow dtypes up front: small integers and categorical labels keep the
+# frame compact and let groupby/crosstab work on integer codes
+DTYPES = {
+    'Product': 'category',
+    'Gender': 'category',
+    'MaritalStatus': 'category',
+    'Age': 'int8',
+    'Education': 'int8',
+    'Usage': 'int8',
+    'Fitness': 'int8',
+    'Income': 'int32',
+    'Miles': 'int16'
+}
+
+# Typed Parquet copy of the CSV. It is reused only while it is at least as new
+# as the CSV (when the CSV is shipped at all), can be read, and still has the
+# dtypes above; otherwise it is rebuilt.
+def read_cache():
+    if not os.path.exists(CACHE_PATH):
+        return None
+    if os.path.exists(CSV_PATH) and os.path.getmtime(CACHE_PATH) < os.path.getmtime(CSV_PATH):
+        return None
+    try:
+        df = pd.read_parquet(CACHE_PATH, engine='pyarrow')
+    except (OSError, pa.ArrowInvalid):
+        return None  # unreadable or truncated file: fall back to the CSV
+    if {col: str(dtype) for col, dtype in df.dtypes.items()} != DTYPES:
+        return None
+    return df
+
+# Cheap cache key for the loaded frame and everything derived from it: the
+# CSV's modification time, or the Parquet file's when only that is deployed.
+# load_data and every cached function built on it take this key instead of the
+# frame itself, so Streamlit never hashes the whole frame, and an edited CSV
+# reloads the data in a running app.
+def data_version():
+    return os.path.getmtime(CSV_PATH if os.path.exists(CSV_PATH) else CACHE_PATH)
+
 @st.cache_data
-def load_data():
-    df = pd.read_csv('aerofit_treadmill_data.csv')
+def load_data(version):
+    df = read_cache()
+    if df is not None:
+        return df
+
+    # The pyarrow engine parses the CSV multithreaded
+    df = pd.read_csv(CSV_PATH, engine='pyarrow', dtype=DTYPES)
+    write_cache(df)
     return df
 
+# Write the cache to a temporary file next to it and move it into place, so an
+# interrupted write (full disk, killed process, two workers racing) never
+# leaves a truncated file under CACHE_PATH. On failure the frame is simply not
+# cached.
+def write_cache(df):
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=CACHE_PATH + '.', suffix='.tmp', dir=os.path.dirname(os.path.abspath(CACHE_PATH))
+        )
+        with os.fdopen(fd, 'wb') as f:
+            df.to_parquet(f, engine='pyarrow', compression='zstd')
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+# Every derived table the sections display, computed together once
+class Metrics(NamedTuple):
+    gender_dist: pd.DataFrame
+    marital_dist: pd.DataFrame
+    education_dist: pd.DataFrame
+    fitness_dist: pd.DataFrame
+    usage_stats: pd.DataFrame
+    miles_stats: pd.DataFrame
+    income_stats: pd.DataFrame
+    fitness_stats: pd.DataFrame
+    product_dist: pd.Series
+    market_share: pd.Series
+    usage_fitness_melted: pd.DataFrame
+    product_prices_df: pd.DataFrame
+    usage_miles_trend: tuple
+    sidebar: tuple
+
+# Integer codes plus sorted labels for a low-cardinality column
+def encode(series):
+    categorical = series.astype('category')
+    return categorical.cat.codes.to_numpy(np.int8), categorical.cat.categories.rename(series.name)
+
+# Row-normalised percentage crosstab of two encoded columns. Counts are
+# scattered straight into a small array instead of going through pd.crosstab.
+def crosstab_pct(rows, cols):
+    (row_codes, row_labels), (col_codes, col_labels) = rows, cols
+    counts = np.zeros((len(row_labels), len(col_labels)), np.int32)
+    np.add.at(counts, (row_codes, col_codes), 1)
+    pct = counts / counts.sum(axis=1, keepdims=True) * 100
+    return pd.DataFrame(pct, index=row_labels, columns=col_labels)
+
+# Per-group mean, median and sample std of every column of a 2-D block, in one
+# pass over the rows. A single lexsort orders each column within the groups for
+# the medians. The result has one (column, stat) pair per frame column, like
+# groupby().agg() with a dict of aggregations.
+def group_stats(codes, labels, block, names):
+    n_groups = len(labels)
+    counts = np.bincount(codes, minlength=n_groups)
+    sums = np.zeros((n_groups, block.shape[1]))
+    np.add.at(sums, codes, block)
+    mean = sums / counts[:, None]
+    sq_dev = np.zeros_like(sums)
+    np.add.at(sq_dev, codes, (block - mean[codes]) ** 2)
+    std = np.sqrt(sq_dev / (counts - 1)[:, None])
+
+    columns = block.T
+    order = np.lexsort((columns, np.broadcast_to(codes, columns.shape)))
+    ordered = np.take_along_axis(columns, order, axis=1)
+    starts = np.cumsum(counts) - counts
+    lower = ordered[:, starts + (counts - 1) // 2]
+    upper = ordered[:, starts + counts // 2]
+    median = ((lower + upper) / 2).T
+
+    return pd.DataFrame(
+        np.stack([mean, median, std], axis=2).reshape(n_groups, -1),
+        index=labels,
+        columns=pd.MultiIndex.from_product([names, ['mean', 'median', 'std']])
+    ).round(2)
+
+# Contiguous float64 copies of the numeric columns, extracted once and shared
+# by the aggregations and the trend line instead of re-reading Series
+@st.cache_resource
+def column_arrays(version):
+    df = load_data(version)
+    return {c: df[c].to_numpy(np.float64) for c in ('Usage', 'Miles', 'Income', 'Fitness')}
+
 # Cache the statistical computations
 @st.cache_data
-def compute_statistics(df):
-    stats = {
-        'gender_dist': pd.crosstab(df['Product'], df['Gender'], normalize='index') * 100,
-        'marital_dist': pd.crosstab(df['Product'], df['MaritalStatus'], normalize='index') * 100,
-        'education_dist': pd.crosstab(df['Product'], df['Education'], normalize='index') * 100,
-        'usage_stats': df.groupby('Product')['Usage'].agg(['mean', 'median', 'std']).round(2),
-        'miles_stats': df.groupby('Product')['Miles'].agg(['mean', 'median', 'std']).round(2),
-        'income_stats': df.groupby('Product')['Income'].agg(['mean', 'median', 'std']).round(2)
+def compute_all(version):
+    df = load_data(version)
+    arrays = column_arrays(version)
+    codes = {c: encode(df[c]) for c in ('Product', 'Gender', 'MaritalStatus', 'Education', 'Fitness')}
+    product = codes['Product']
+    product_stats = group_stats(*product, np.column_stack(list(arrays.values())), list(arrays))
+
+    fitness_dist = crosstab_pct(codes['Product'], codes['Fitness'])
+    # Convert column names to strings
+    fitness_dist.columns = fitness_dist.columns.astype(str)
+
+    # Usage vs Fitness Level shares, in long form for the bubble chart. Counts
+    # go into a (fitness, usage, product) cube in one pass; each (usage,
+    # product) pair is then normalised over fitness levels. Pairs that never
+    # occur are dropped, as a crosstab would.
+    usage_codes, usage_labels = encode(df['Usage'])
+    fitness_codes, fitness_labels = codes['Fitness']
+    product_codes, product_labels = product
+    cube = np.zeros((len(fitness_labels), len(usage_labels), len(product_labels)), np.int32)
+    np.add.at(cube, (fitness_codes, usage_codes, product_codes), 1)
+    totals = cube.sum(axis=0)
+    pct = cube / np.where(totals > 0, totals, 1) * 100
+    f_idx, u_idx, p_idx = np.indices(cube.shape).reshape(3, -1)
+    seen = totals[u_idx, p_idx] > 0
+    usage_fitness_melted = pd.DataFrame({
+        'Usage': usage_labels[u_idx[seen]],
+        'Product': product_labels[p_idx[seen]],
+        'Fitness': fitness_labels[f_idx[seen]],
+        'Percentage': pct.ravel()[seen]
+    })
+
+    # Customers per product; the market share is derived from the same counts
+    product_counts = df['Product'].value_counts()
+
+    product_prices = {
+        'KP281': 1500,
+        'KP481': 1750,
+        'KP781': 2500
     }
-    return stats
+
+    return Metrics(
+        gender_dist=crosstab_pct(codes['Product'], codes['Gender']),
+        marital_dist=crosstab_pct(codes['Product'], codes['MaritalStatus']),
+        education_dist=crosstab_pct(codes['Product'], codes['Education']),
+        fitness_dist=fitness_dist,
+        usage_stats=product_stats['Usage'],
+        miles_stats=product_stats['Miles'],
+        income_stats=product_stats['Income'],
+        fitness_stats=product_stats['Fitness'],
+        product_dist=product_counts,
+        market_share=product_counts / product_counts.sum() * 100,
+        usage_fitness_melted=usage_fitness_melted,
+        product_prices_df=pd.DataFrame({
+            'Product': list(product_prices.keys()),
+            'Price': list(product_prices.values())
+        }),
+        # Overall least-squares line for the Usage vs Miles scatter as (slope, intercept)
+        usage_miles_trend=tuple(np.polyfit(arrays['Usage'], arrays['Miles'], 1)),
+        # Headline numbers for the sidebar: customer count, mean age and mean income
+        sidebar=(len(df), float(df['Age'].mean()), float(arrays['Income'].mean()))
+    )
 
 # Load data and compute statistics once
-df = load_data()
-stats = compute_statistics(df)
+version = data_version()
+df = load_data(version)
+metrics = compute_all(version)
 
 # Sidebar metrics
-total_customers = len(df)
-avg_age = df['Age'].mean()
-avg_income = df['Income'].mean()
+total_customers, avg_age, avg_income = metrics.sidebar
 
 # Sidebar
 st.sidebar.title("🏃‍♂️ AeroFit Analytics")
@@ -179,139 +293,293 @@ sections = [
 ]
 section = st.sidebar.selectbox("Choose Analysis Section", sections)
 
-# Chart creation functions
-def create_bar_chart(data, x, y, title, color=None):
-    fig = px.bar(
-        data,
-        x=x,
-        y=y,
-        title=title,
-        color=color,
-        template="plotly_dark",
-        color_discrete_sequence=px.colors.qualitative.Set3
-    )
-    
+# Figures built inline in the sections below are kept per browser session, so
+# switching back to a section reuses them instead of rebuilding
+figs = st.session_state.setdefault('figs', {})
+
+# Plotly config for every chart: no modebar, and figures already carry the
+# dark template so Streamlit's own theme pass is skipped (theme=None)
+_CFG = {'displayModeBar': False, 'responsive': True}
+# Insight-only charts (product mix, price points) are drawn without any
+# hover/zoom event handling
+_STATIC_CFG = {**_CFG, 'staticPlot': True}
+# They also get a fixed size and are shown with use_container_width=False, so
+# plotly.js never re-lays them out when the column resizes
+_STATIC_SIZE = dict(width=600, height=450, autosize=False)
+
+# Chart creation functions. Figures only depend on their arguments, so they are
+# built once with st.cache_resource and the same object is handed back on every
+# rerun. Callers must not mutate the returned figures. Traces are constructed
+# directly rather than through plotly.express, which would first rewrite the
+# data into long form and infer every column role.
+_PALETTE = px.colors.qualitative.Set3
+
+def _figure(traces, title, x_title, y_title, **layout):
+    fig = go.Figure(data=traces)
     fig.update_layout(
-        paper_bgcolor=COLORS['card'],
-        plot_bgcolor=COLORS['card'],
-        font_color=COLORS['text'],
-        title_font_color=COLORS['text'],
-        legend_font_color=COLORS['text'],
-        xaxis=dict(
-            gridcolor=COLORS['grid'],
-            zerolinecolor=COLORS['grid'],
-            tickfont=dict(color=COLORS['text'])
-        ),
-        yaxis=dict(
-            gridcolor=COLORS['grid'],
-            zerolinecolor=COLORS['grid'],
-            tickfont=dict(color=COLORS['text'])
+        template="custom_dark",
+        title_text=title,
+        xaxis_title_text=x_title,
+        yaxis_title_text=y_title,
+        **layout
+    )
+    return fig
+
+# y may name one column or list several; several columns are stacked, one
+# trace each, as in a wide-form px.bar
+@st.cache_resource
+def create_bar_chart(data, x, y, title, **layout):
+    if isinstance(y, str):
+        trace = go.Bar(
+            x=data[x], y=data[y], marker_color=_PALETTE[0], showlegend=False,
+            hovertemplate=f"{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>"
         )
+        return _figure([trace], title, x, y, barmode='relative', **layout)
+    traces = [
+        go.Bar(
+            x=data[x], y=data[col], name=col, marker_color=_PALETTE[i % len(_PALETTE)],
+            hovertemplate=f"variable={col}<br>{x}=%{{x}}<br>value=%{{y}}<extra></extra>"
+        )
+        for i, col in enumerate(y)
+    ]
+    return _figure(traces, title, x, 'value', barmode='relative', legend_title_text='variable', **layout)
+
+# The point-level charts below read the frame through load_data(version)
+# rather than taking it as an argument, for the reason given at data_version
+@st.cache_resource
+def create_box_plot(version, x, y, title):
+    data = load_data(version)
+    trace = go.Box(
+        x=data[x], y=data[y], marker_color=_PALETTE[0], showlegend=False,
+        hovertemplate=f"{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>"
+    )
+    return _figure([trace], title, x, y, boxmode='group')
+
+# One WebGL marker trace per value of color (or a single trace without it)
+@st.cache_resource
+def create_scatter_plot(version, x, y, title, color=None):
+    data = load_data(version)
+    if color is None:
+        trace = go.Scattergl(
+            x=data[x], y=data[y], mode='markers', marker_color=_PALETTE[0], showlegend=False,
+            hovertemplate=f"{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>"
+        )
+        return _figure([trace], title, x, y)
+    traces = [
+        go.Scattergl(
+            x=group[x], y=group[y], mode='markers', name=str(name),
+            marker_color=_PALETTE[i % len(_PALETTE)],
+            hovertemplate=f"{color}={name}<br>{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>"
+        )
+        for i, (name, group) in enumerate(data.groupby(color, observed=True))
+    ]
+    return _figure(traces, title, x, y, legend_title_text=color)
+
+# Above this many rows every raw-point scatter (Age vs Income, Usage vs Miles)
+# is binned into a heatmap on the server instead of drawing every marker in the
+# browser
+_DENSITY_ROWS = 5000
+
+# Bin index and bin centre per value for one heatmap axis. Axes with few
+# distinct values (Usage is 2-7) get one bin per value, so no empty stripes
+# appear between them; wider ranges are split into max_bins equal bins.
+def _axis_bins(values, max_bins):
+    distinct, index = np.unique(values, return_inverse=True)
+    if len(distinct) <= max_bins:
+        return index, distinct
+    edges = np.histogram_bin_edges(values, bins=max_bins)
+    index = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, max_bins - 1)
+    return index, (edges[:-1] + edges[1:]) / 2
+
+# Customer counts on an x/y grid, one panel per value of color, so the binned
+# view keeps the per-product split of the scatter it replaces. trend is an
+# optional (slope, intercept) fit drawn over every panel.
+@st.cache_resource
+def create_density_heatmap(version, x, y, title, color='Product', max_bins=40, trend=None):
+    data = load_data(version)
+    x_index, x_centres = _axis_bins(data[x].to_numpy(np.float64), max_bins)
+    y_index, y_centres = _axis_bins(data[y].to_numpy(np.float64), max_bins)
+    group_codes, groups = encode(data[color])
+    counts = np.zeros((len(groups), len(y_centres), len(x_centres)), np.int32)
+    np.add.at(counts, (group_codes, y_index, x_index), 1)
+
+    fig = px.imshow(
+        counts,
+        x=x_centres,
+        y=y_centres,
+        facet_col=0,
+        origin='lower',
+        aspect='auto',
+        labels={'x': x, 'y': y, 'color': 'Customers'},
+        title=title,
+        template="custom_dark"
+    )
+    fig.for_each_annotation(
+        lambda a: a.update(text=f"{color}={groups[int(a.text.split('=')[1])]}")
     )
+    if trend is not None:
+        slope, intercept = trend
+        xs = np.array([x_centres[0], x_centres[-1]])
+        for i in range(len(groups)):
+            fig.add_trace(go.Scattergl(
+                x=xs,
+                y=slope * xs + intercept,
+                mode='lines',
+                name='trend',
+                line=dict(color='white', dash='dash'),
+                showlegend=False
+            ), row=1, col=i + 1)
     return fig
 
-def create_box_plot(data, x, y, title, color=None):
-    fig = px.box(
-        data,
-        x=x,
-        y=y,
+@st.cache_resource
+def build_pie_chart(values, names, title):
+    fig = px.pie(
+        values=list(values),
+        names=list(names),
         title=title,
-        color=color,
-        template="plotly_dark",
+        hole=0.4,
+        template="custom_dark",
         color_discrete_sequence=px.colors.qualitative.Set3
     )
-    
     fig.update_layout(
         paper_bgcolor=COLORS['card'],
         plot_bgcolor=COLORS['card'],
-        font_color=COLORS['text'],
-        title_font_color=COLORS['text'],
-        legend_font_color=COLORS['text'],
-        xaxis=dict(
-            gridcolor=COLORS['grid'],
-            zerolinecolor=COLORS['grid'],
-            tickfont=dict(color=COLORS['text'])
-        ),
-        yaxis=dict(
-            gridcolor=COLORS['grid'],
-            zerolinecolor=COLORS['grid'],
-            tickfont=dict(color=COLORS['text'])
-        )
+        **_STATIC_SIZE
     )
     return fig
 
-def create_scatter_plot(data, x, y, title, color=None, size=None):
-    fig = px.scatter(
-        data,
-        x=x,
-        y=y,
+@st.cache_resource
+def build_stacked_bar(data, title, legend_title, height=None):
+    fig = px.bar(
+        data.reset_index(),
+        x='Product',
+        y=data.columns.tolist(),
         title=title,
-        color=color,
-        size=size,
-        template="plotly_dark",
-        color_discrete_sequence=px.colors.qualitative.Set3
+        labels={'value': 'Percentage', 'variable': legend_title},
+        color_discrete_sequence=px.colors.qualitative.Set3,
+        barmode='stack'
     )
-    
     fig.update_layout(
-        paper_bgcolor=COLORS['card'],
-        plot_bgcolor=COLORS['card'],
-        font_color=COLORS['text'],
-        title_font_color=COLORS['text'],
-        legend_font_color=COLORS['text'],
-        xaxis=dict(
-            gridcolor=COLORS['grid'],
-            zerolinecolor=COLORS['grid'],
-            tickfont=dict(color=COLORS['text'])
+        legend_title_text=legend_title,
+        yaxis_title='Percentage',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        showlegend=True,
+        legend=dict(
+            bgcolor='rgba(0,0,0,0)',
+            bordercolor='rgba(255,255,255,0.1)',
+            borderwidth=1
         ),
-        yaxis=dict(
-            gridcolor=COLORS['grid'],
-            zerolinecolor=COLORS['grid'],
-            tickfont=dict(color=COLORS['text'])
-        )
+        height=height
     )
     return fig
 
-# Main content sections
-if section == "Product Overview":
+# Templates for the stats tables, filled with %-substitution from
+# pre-formatted strings
+_STATS_ROW = "<tr><td>%s</td><td>%s</td><td>%s</td><td>%s</td></tr>"
+_STATS_NOTE = '<p style="margin-top: 10px; font-size: 0.9em; color: #A0AEC0;">%s</p>'
+_STATS_TABLE = """
+    <div class="insight-box">
+        <h3>%s</h3>
+        <table>
+            <tr><th>Product</th><th>Mean</th><th>Median</th><th>Std Dev</th></tr>
+            %s
+        </table>%s
+    </div>
+    """
+
+# One tuple of display strings per product: the label, then mean / median /
+# std formatted with the matching spec from fmt. Only called from the cached
+# stats_table_html, so it needs no cache of its own.
+def format_rows(stats_df, fmt):
+    return tuple(
+        (product, *(spec.format(value) for spec, value in zip(fmt, values)))
+        for product, values in zip(stats_df.index, stats_df[['mean', 'median', 'std']].to_numpy())
+    )
+
+# Stats tables (mean / median / std per product) rendered to HTML once per
+# distinct input. fmt holds one format spec per column.
+@st.cache_data
+def stats_table_html(stats_df, title, fmt, note=None):
+    rows = "".join(_STATS_ROW % row for row in format_rows(stats_df, fmt))
+    return _STATS_TABLE % (title, rows, _STATS_NOTE % note if note else "")
+
+# Target customer profile per product, shown side by side in the Target
+# Audience section. The content is static, so the HTML is built once at import.
+_PROFILES = {
+    'KP281': [
+        'Age: 18-30 years',
+        'Income: $25k-40k',
+        'Fitness: Beginner to Intermediate',
+        'Usage: 2-3 times/week',
+        'Gender: Mixed distribution',
+        'Price Sensitive'
+    ],
+    'KP481': [
+        'Age: 25-35 years',
+        'Income: $40k-75k',
+        'Fitness: Intermediate',
+        'Usage: 3-4 times/week',
+        'Gender: Balanced mix',
+        'Value-focused'
+    ],
+    'KP781': [
+        'Age: 30-50 years',
+        'Income: $75k+',
+        'Fitness: Intermediate to Advanced',
+        'Usage: 4-5 times/week',
+        'Gender: Slight male preference',
+        'Premium features priority'
+    ]
+}
+_PROFILE_HTML = (
+    '<div class="insight-box"><h3>Target Customer Profiles</h3>'
+    '<div style="display: flex; justify-content: space-between; margin-top: 15px;">'
+    + "".join(
+        '<div style="flex: 1; margin: 0 10px; padding: 15px; background: rgba(255,255,255,0.05); border-radius: 5px;">'
+        '<h4 style="color: #4A90E2;">%s</h4><ul style="list-style-type: none; padding-left: 0;">%s</ul></div>' % (
+            product, "".join('<li style="margin: 5px 0;">%s</li>' % item for item in items)
+        )
+        for product, items in _PROFILES.items()
+    )
+    + '</div></div>'
+)
+
+# Main content sections, one render function each; only the selected one runs
+def render_overview():
     st.title("Product Overview")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Product Distribution
-        product_dist = df['Product'].value_counts()
-        fig = px.pie(
-            values=product_dist.values,
-            names=product_dist.index,
-            title="Product Distribution",
-            hole=0.4,
-            template="plotly_dark",
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        fig.update_layout(
-            paper_bgcolor=COLORS['card'],
-            plot_bgcolor=COLORS['card']
+        product_dist = metrics.product_dist
+        fig = build_pie_chart(
+            tuple(product_dist.values.tolist()),
+            tuple(product_dist.index.tolist()),
+            "Product Distribution"
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=False, theme=None, config=_STATIC_CFG)
         
         # Age Distribution
         fig = create_box_plot(
-            df,
+            version,
             x='Product',
             y='Age',
             title="Age Distribution by Product"
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, theme=None, config=_CFG)
     
     with col2:
         # Income Distribution
         fig = create_box_plot(
-            df,
+            version,
             x='Product',
             y='Income',
             title="Income Distribution by Product"
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, theme=None, config=_CFG)
         
         # Key insights
         st.markdown("""
@@ -325,14 +593,14 @@ if section == "Product Overview":
         </div>
         """, unsafe_allow_html=True)
 
-elif section == "Customer Segments":
+def render_segments():
     st.title("Customer Segments")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Gender Distribution
-        gender_dist = stats['gender_dist']
+        gender_dist = metrics.gender_dist
         gender_dist_reset = gender_dist.reset_index()
         fig = create_bar_chart(
             gender_dist_reset,
@@ -340,10 +608,10 @@ elif section == "Customer Segments":
             y=['Female', 'Male'],
             title="Gender Distribution by Product (%)"
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, theme=None, config=_CFG)
         
         # Marital Status
-        marital_dist = stats['marital_dist']
+        marital_dist = metrics.marital_dist
         marital_dist_reset = marital_dist.reset_index()
         fig = create_bar_chart(
             marital_dist_reset,
@@ -351,198 +619,107 @@ elif section == "Customer Segments":
             y=['Single', 'Partnered'],
             title="Marital Status by Product (%)"
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, theme=None, config=_CFG)
     
     with col2:
         # Fitness Level Distribution
-        fitness_counts = pd.crosstab(df['Product'], df['Fitness'], normalize='index') * 100
-        # Convert column names to strings
-        fitness_counts.columns = fitness_counts.columns.astype(str)
-        fitness_counts_reset = fitness_counts.reset_index()
-        
         # Create stacked bar chart for fitness levels
-        fig = px.bar(
-            fitness_counts_reset,
-            x='Product',
-            y=fitness_counts.columns.tolist(),
+        fig = build_stacked_bar(
+            metrics.fitness_dist,
             title="Fitness Level Distribution by Product (%)",
-            labels={'value': 'Percentage', 'variable': 'Fitness Level'},
-            color_discrete_sequence=px.colors.qualitative.Set3,
-            barmode='stack'
-        )
-        fig.update_layout(
-            legend_title_text='Fitness Level',
-            yaxis_title='Percentage',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='white'),
-            legend=dict(
-                bgcolor='rgba(0,0,0,0)',
-                bordercolor='rgba(255,255,255,0.1)',
-                borderwidth=1
-            )
+            legend_title='Fitness Level'
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, theme=None, config=_CFG)
         
         # Fitness Level Statistics
-        fitness_stats = df.groupby('Product')['Fitness'].agg(['mean', 'median', 'std']).round(2)
-        st.markdown("""
-        <div class="insight-box">
-            <h3>Fitness Level Analysis</h3>
-            <table>
-                <tr><th>Product</th><th>Mean</th><th>Median</th><th>Std Dev</th></tr>
-                <tr><td>KP281</td><td>{:.1f}</td><td>{:.1f}</td><td>{:.1f}</td></tr>
-                <tr><td>KP481</td><td>{:.1f}</td><td>{:.1f}</td><td>{:.1f}</td></tr>
-                <tr><td>KP781</td><td>{:.1f}</td><td>{:.1f}</td><td>{:.1f}</td></tr>
-            </table>
-            <p style="margin-top: 10px; font-size: 0.9em; color: #A0AEC0;">
-                Fitness Level Scale: 1 (Beginner) to 5 (Expert)
-            </p>
-        </div>
-        """.format(
-            fitness_stats.loc['KP281', 'mean'], fitness_stats.loc['KP281', 'median'], fitness_stats.loc['KP281', 'std'],
-            fitness_stats.loc['KP481', 'mean'], fitness_stats.loc['KP481', 'median'], fitness_stats.loc['KP481', 'std'],
-            fitness_stats.loc['KP781', 'mean'], fitness_stats.loc['KP781', 'median'], fitness_stats.loc['KP781', 'std']
+        fitness_stats = metrics.fitness_stats
+        st.markdown(stats_table_html(
+            fitness_stats, 'Fitness Level Analysis', ('{:.1f}', '{:.1f}', '{:.1f}'),
+            'Fitness Level Scale: 1 (Beginner) to 5 (Expert)'
         ), unsafe_allow_html=True)
         
-        # Updated Customer Segments Insights
-        st.markdown("""
+        # Updated Customer Segments Insights (plain dicts avoid per-value .loc lookups)
+        fitness = fitness_stats.to_dict('index')
+        gender = metrics.gender_dist.to_dict('index')
+        st.markdown(f"""
         <div class="insight-box">
             <h3>Segment Insights</h3>
             <ul>
-                <li>KP781 attracts higher fitness levels (mean: {:.1f})</li>
+                <li>KP781 attracts higher fitness levels (mean: {fitness['KP781']['mean']:.1f})</li>
                 <li>KP281 shows diverse fitness distribution</li>
-                <li>Gender preferences vary by model ({:.1f}% female in KP481)</li>
+                <li>Gender preferences vary by model ({gender['KP481']['Female']:.1f}% female in KP481)</li>
                 <li>Marital status impacts purchase decisions</li>
             </ul>
         </div>
-        """.format(
-            fitness_stats.loc['KP781', 'mean'],
-            stats['gender_dist'].loc['KP481', 'Female']
-        ), unsafe_allow_html=True)
+        """, unsafe_allow_html=True)
 
-elif section == "Target Audience Analysis":
+def render_audience():
     st.title("Target Audience Analysis")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Age and Income Distribution by Product
-        fig = px.scatter(
-            df,
-            x='Age',
-            y='Income',
-            color='Product',
-            title='Target Audience Segmentation: Age vs Income',
-            labels={
-                'Age': 'Customer Age',
-                'Income': 'Annual Income ($)',
-                'Product': 'Treadmill Model'
-            },
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        
-        fig.update_traces(
-            marker=dict(size=10, line=dict(width=1, color='white')),
-            hovertemplate="<br>".join([
-                "Product: %{customdata[0]}",
-                "Age: %{x} years",
-                "Income: $%{y:,.0f}",
-                "Fitness Level: %{customdata[1]}",
-                "<extra></extra>"
-            ])
-        )
-        
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='white'),
-            showlegend=True,
-            legend=dict(
-                bgcolor='rgba(0,0,0,0)',
-                bordercolor='rgba(255,255,255,0.1)',
-                borderwidth=1
-            ),
-            height=500
-        )
+        fig = figs.get('audience')
+        if fig is None and len(df) > _DENSITY_ROWS:
+            fig = create_density_heatmap(version, x='Age', y='Income', title='Target Audience Segmentation: Age vs Income')
+        if fig is None:
+            fig = px.scatter(
+                df,
+                x='Age',
+                y='Income',
+                color='Product',
+                custom_data=['Product', 'Fitness'],
+                title='Target Audience Segmentation: Age vs Income',
+                labels={
+                    'Age': 'Customer Age',
+                    'Income': 'Annual Income ($)',
+                    'Product': 'Treadmill Model'
+                },
+                color_discrete_sequence=px.colors.qualitative.Set2,
+                render_mode='webgl'
+            )
+            
+            fig.update_traces(
+                marker=dict(size=10, line=dict(width=1, color='white')),
+                hovertemplate="<br>".join([
+                    "Product: %{customdata[0]}",
+                    "Age: %{x} years",
+                    "Income: $%{y:,.0f}",
+                    "Fitness Level: %{customdata[1]}",
+                    "<extra></extra>"
+                ])
+            )
+            
+            fig.update_layout(
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(color='white'),
+                showlegend=True,
+                legend=dict(
+                    bgcolor='rgba(0,0,0,0)',
+                    bordercolor='rgba(255,255,255,0.1)',
+                    borderwidth=1
+                ),
+                height=500
+            )
+            figs['audience'] = fig
         
-        fig.update_traces(customdata=df[['Product', 'Fitness']])
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, theme=None, config=_CFG)
         
         # Product-wise Customer Profile
-        product_profiles = pd.DataFrame({
-            'KP281': [
-                'Age: 18-30 years',
-                'Income: $25k-40k',
-                'Fitness: Beginner to Intermediate',
-                'Usage: 2-3 times/week',
-                'Gender: Mixed distribution',
-                'Price Sensitive'
-            ],
-            'KP481': [
-                'Age: 25-35 years',
-                'Income: $40k-75k',
-                'Fitness: Intermediate',
-                'Usage: 3-4 times/week',
-                'Gender: Balanced mix',
-                'Value-focused'
-            ],
-            'KP781': [
-                'Age: 30-50 years',
-                'Income: $75k+',
-                'Fitness: Intermediate to Advanced',
-                'Usage: 4-5 times/week',
-                'Gender: Slight male preference',
-                'Premium features priority'
-            ]
-        })
-        
-        st.markdown("""
-        <div class="insight-box">
-            <h3>Target Customer Profiles</h3>
-            <div style="display: flex; justify-content: space-between; margin-top: 15px;">
-        """, unsafe_allow_html=True)
-        
-        for product in ['KP281', 'KP481', 'KP781']:
-            st.markdown(f"""
-                <div style="flex: 1; margin: 0 10px; padding: 15px; background: rgba(255,255,255,0.05); border-radius: 5px;">
-                    <h4 style="color: #4A90E2;">{product}</h4>
-                    <ul style="list-style-type: none; padding-left: 0;">
-                        {''.join(f'<li style="margin: 5px 0;">{item}</li>' for item in product_profiles[product])}
-                    </ul>
-                </div>
-            """, unsafe_allow_html=True)
-        
-        st.markdown("</div></div>", unsafe_allow_html=True)
+        st.markdown(_PROFILE_HTML, unsafe_allow_html=True)
     
     with col2:
         # Education Level Distribution
-        education_dist = stats['education_dist']
-        education_dist_reset = education_dist.reset_index()
-        
-        fig = px.bar(
-            education_dist_reset,
-            x='Product',
-            y=education_dist.columns,
+        education_dist = metrics.education_dist
+        fig = build_stacked_bar(
+            education_dist,
             title='Education Level Distribution by Product (%)',
-            labels={'value': 'Percentage', 'variable': 'Years of Education'},
-            color_discrete_sequence=px.colors.qualitative.Set3,
-            barmode='stack'
-        )
-        
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='white'),
-            showlegend=True,
-            legend=dict(
-                bgcolor='rgba(0,0,0,0)',
-                bordercolor='rgba(255,255,255,0.1)',
-                borderwidth=1
-            ),
+            legend_title='Years of Education',
             height=400
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, theme=None, config=_CFG)
         
         # Key Target Audience Insights
         st.markdown("""
@@ -585,286 +762,252 @@ elif section == "Target Audience Analysis":
         </div>
         """, unsafe_allow_html=True)
 
-elif section == "Usage Analysis":
+def render_usage():
     st.title("Usage Analysis")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Usage vs Fitness Level Analysis (bubble chart - already enhanced)
-        usage_fitness = pd.crosstab([df['Usage'], df['Product']], df['Fitness'])
-        usage_fitness_pct = usage_fitness.div(usage_fitness.sum(axis=1), axis=0) * 100
-        usage_fitness_pct = usage_fitness_pct.reset_index()
-        
-        usage_fitness_melted = pd.melt(
-            usage_fitness_pct,
-            id_vars=['Usage', 'Product'],
-            var_name='Fitness',
-            value_name='Percentage'
-        )
-        
-        fig = px.scatter(
-            usage_fitness_melted,
-            x='Usage',
-            y='Fitness',
-            size='Percentage',
-            color='Product',
-            title='Usage vs Fitness Level Distribution',
-            labels={
-                'Usage': 'Usage Frequency (times/week)',
-                'Fitness': 'Fitness Level',
-                'Percentage': 'Percentage of Users'
-            },
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        
-        fig.update_traces(
-            marker=dict(line=dict(width=1, color='white')),
-            hovertemplate="<br>".join([
-                "Product: %{customdata[0]}",
-                "Usage: %{x} times/week",
-                "Fitness Level: %{y}",
-                "Percentage: %{marker.size:.1f}%",
-                "<extra></extra>"
-            ])
-        )
+        usage_fitness_melted = metrics.usage_fitness_melted
         
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='white'),
-            showlegend=True,
-            legend=dict(
-                bgcolor='rgba(0,0,0,0)',
-                bordercolor='rgba(255,255,255,0.1)',
-                borderwidth=1
-            ),
-            xaxis=dict(
-                gridcolor='rgba(255,255,255,0.1)',
-                tickmode='linear',
-                tick0=0,
-                dtick=1
-            ),
-            yaxis=dict(
-                gridcolor='rgba(255,255,255,0.1)',
-                tickmode='linear',
-                tick0=1,
-                dtick=1
-            ),
-            height=500
-        )
+        fig = figs.get('usage_fitness')
+        if fig is None:
+            fig = px.scatter(
+                usage_fitness_melted,
+                x='Usage',
+                y='Fitness',
+                size='Percentage',
+                color='Product',
+                custom_data=['Product'],
+                title='Usage vs Fitness Level Distribution',
+                labels={
+                    'Usage': 'Usage Frequency (times/week)',
+                    'Fitness': 'Fitness Level',
+                    'Percentage': 'Percentage of Users'
+                },
+                color_discrete_sequence=px.colors.qualitative.Set2,
+                render_mode='webgl'
+            )
+            
+            fig.update_traces(
+                marker=dict(line=dict(width=1, color='white')),
+                hovertemplate="<br>".join([
+                    "Product: %{customdata[0]}",
+                    "Usage: %{x} times/week",
+                    "Fitness Level: %{y}",
+                    "Percentage: %{marker.size:.1f}%",
+                    "<extra></extra>"
+                ])
+            )
+            
+            fig.update_layout(
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(color='white'),
+                showlegend=True,
+                legend=dict(
+                    bgcolor='rgba(0,0,0,0)',
+                    bordercolor='rgba(255,255,255,0.1)',
+                    borderwidth=1
+                ),
+                xaxis=dict(
+                    gridcolor='rgba(255,255,255,0.1)',
+                    tickmode='linear',
+                    tick0=0,
+                    dtick=1
+                ),
+                yaxis=dict(
+                    gridcolor='rgba(255,255,255,0.1)',
+                    tickmode='linear',
+                    tick0=1,
+                    dtick=1
+                ),
+                height=500
+            )
+            figs['usage_fitness'] = fig
         
-        fig.update_traces(customdata=usage_fitness_melted[['Product']])
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, theme=None, config=_CFG)
         
         # Usage Statistics
-        usage_stats = stats['usage_stats']
-        st.markdown("""
-        <div class="insight-box">
-            <h3>Usage Frequency Analysis</h3>
-            <table>
-                <tr><th>Product</th><th>Mean</th><th>Median</th><th>Std Dev</th></tr>
-                <tr><td>KP281</td><td>{:.1f}</td><td>{:.1f}</td><td>{:.1f}</td></tr>
-                <tr><td>KP481</td><td>{:.1f}</td><td>{:.1f}</td><td>{:.1f}</td></tr>
-                <tr><td>KP781</td><td>{:.1f}</td><td>{:.1f}</td><td>{:.1f}</td></tr>
-            </table>
-            <p style="margin-top: 10px; font-size: 0.9em; color: #A0AEC0;">
-                Usage Frequency: Times per week
-            </p>
-        </div>
-        """.format(
-            usage_stats.loc['KP281', 'mean'], usage_stats.loc['KP281', 'median'], usage_stats.loc['KP281', 'std'],
-            usage_stats.loc['KP481', 'mean'], usage_stats.loc['KP481', 'median'], usage_stats.loc['KP481', 'std'],
-            usage_stats.loc['KP781', 'mean'], usage_stats.loc['KP781', 'median'], usage_stats.loc['KP781', 'std']
+        usage_stats = metrics.usage_stats
+        st.markdown(stats_table_html(
+            usage_stats, 'Usage Frequency Analysis', ('{:.1f}', '{:.1f}', '{:.1f}'),
+            'Usage Frequency: Times per week'
         ), unsafe_allow_html=True)
     
     with col2:
         # Usage vs Miles Analysis
-        fig = px.scatter(
-            df,
-            x='Usage',
-            y='Miles',
-            color='Product',
-            title='Usage Frequency vs Miles Covered',
-            labels={
-                'Usage': 'Usage Frequency (times/week)',
-                'Miles': 'Miles Covered',
-                'Product': 'Product Model'
-            },
-            color_discrete_sequence=px.colors.qualitative.Set2,
-            trendline="ols",
-            trendline_scope="overall"
-        )
-        
-        fig.update_traces(
-            marker=dict(
-                size=8,
-                line=dict(width=1, color='white')
-            ),
-            hovertemplate="<br>".join([
-                "Product: %{customdata[0]}",
-                "Usage: %{x} times/week",
-                "Miles: %{y:.0f}",
-                "<extra></extra>"
-            ])
-        )
-        
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='white'),
-            showlegend=True,
-            legend=dict(
-                bgcolor='rgba(0,0,0,0)',
-                bordercolor='rgba(255,255,255,0.1)',
-                borderwidth=1
-            ),
-            xaxis=dict(
-                gridcolor='rgba(255,255,255,0.1)',
-                tickmode='linear',
-                tick0=0,
-                dtick=1
-            ),
-            yaxis=dict(
-                gridcolor='rgba(255,255,255,0.1)'
-            ),
-            height=500
-        )
+        fig = figs.get('usage_miles')
+        if fig is None and len(df) > _DENSITY_ROWS:
+            fig = create_density_heatmap(
+                version, x='Usage', y='Miles', title='Usage Frequency vs Miles Covered',
+                trend=metrics.usage_miles_trend
+            )
+        if fig is None:
+            fig = px.scatter(
+                df,
+                x='Usage',
+                y='Miles',
+                color='Product',
+                custom_data=['Product'],
+                title='Usage Frequency vs Miles Covered',
+                labels={
+                    'Usage': 'Usage Frequency (times/week)',
+                    'Miles': 'Miles Covered',
+                    'Product': 'Product Model'
+                },
+                color_discrete_sequence=px.colors.qualitative.Set2,
+                render_mode='webgl'
+            )
+            
+            fig.update_traces(
+                marker=dict(
+                    size=8,
+                    line=dict(width=1, color='white')
+                ),
+                hovertemplate="<br>".join([
+                    "Product: %{customdata[0]}",
+                    "Usage: %{x} times/week",
+                    "Miles: %{y:.0f}",
+                    "<extra></extra>"
+                ])
+            )
+            
+            # Overall trend line from the cached fit, drawn across the observed usage range
+            slope, intercept = metrics.usage_miles_trend
+            usage_values = column_arrays(version)['Usage']
+            xs = np.array([usage_values.min(), usage_values.max()])
+            fig.add_trace(go.Scattergl(
+                x=xs,
+                y=slope * xs + intercept,
+                mode='lines',
+                name='trend',
+                line=dict(color='white', dash='dash'),
+                showlegend=False
+            ))
+            
+            fig.update_layout(
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(color='white'),
+                showlegend=True,
+                legend=dict(
+                    bgcolor='rgba(0,0,0,0)',
+                    bordercolor='rgba(255,255,255,0.1)',
+                    borderwidth=1
+                ),
+                xaxis=dict(
+                    gridcolor='rgba(255,255,255,0.1)',
+                    tickmode='linear',
+                    tick0=0,
+                    dtick=1
+                ),
+                yaxis=dict(
+                    gridcolor='rgba(255,255,255,0.1)'
+                ),
+                height=500
+            )
+            figs['usage_miles'] = fig
         
-        fig.update_traces(customdata=df[['Product']])
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, theme=None, config=_CFG)
         
         # Miles Statistics
-        miles_stats = stats['miles_stats']
-        st.markdown("""
-        <div class="insight-box">
-            <h3>Miles Coverage Analysis</h3>
-            <table>
-                <tr><th>Product</th><th>Mean</th><th>Median</th><th>Std Dev</th></tr>
-                <tr><td>KP281</td><td>{:.0f}</td><td>{:.0f}</td><td>{:.1f}</td></tr>
-                <tr><td>KP481</td><td>{:.0f}</td><td>{:.0f}</td><td>{:.1f}</td></tr>
-                <tr><td>KP781</td><td>{:.0f}</td><td>{:.0f}</td><td>{:.1f}</td></tr>
-            </table>
-            <p style="margin-top: 10px; font-size: 0.9em; color: #A0AEC0;">
-                Average miles covered by users of each product
-            </p>
-        </div>
-        """.format(
-            miles_stats.loc['KP281', 'mean'], miles_stats.loc['KP281', 'median'], miles_stats.loc['KP281', 'std'],
-            miles_stats.loc['KP481', 'mean'], miles_stats.loc['KP481', 'median'], miles_stats.loc['KP481', 'std'],
-            miles_stats.loc['KP781', 'mean'], miles_stats.loc['KP781', 'median'], miles_stats.loc['KP781', 'std']
+        miles_stats = metrics.miles_stats
+        st.markdown(stats_table_html(
+            miles_stats, 'Miles Coverage Analysis', ('{:.0f}', '{:.0f}', '{:.1f}'),
+            'Average miles covered by users of each product'
         ), unsafe_allow_html=True)
         
         # Key Insights
-        st.markdown("""
+        usage = usage_stats.to_dict('index')
+        miles = miles_stats.to_dict('index')
+        st.markdown(f"""
         <div class="insight-box">
             <h3>Key Usage Insights</h3>
             <ul>
                 <li>Strong correlation between usage frequency and miles covered</li>
-                <li>KP781 users show higher average weekly usage ({:.1f} times)</li>
-                <li>KP781 users cover more miles on average ({:.0f} miles)</li>
+                <li>KP781 users show higher average weekly usage ({usage['KP781']['mean']:.1f} times)</li>
+                <li>KP781 users cover more miles on average ({miles['KP781']['mean']:.0f} miles)</li>
                 <li>Higher fitness levels correlate with increased usage</li>
             </ul>
         </div>
-        """.format(
-            usage_stats.loc['KP781', 'mean'],
-            miles_stats.loc['KP781', 'mean']
-        ), unsafe_allow_html=True)
+        """, unsafe_allow_html=True)
 
-elif section == "Financial Insights":
+def render_financial():
     st.title("Financial Insights")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Income Statistics by Product
-        income_stats = stats['income_stats']
-        st.markdown("""
-        <div class="insight-box">
-            <h3>Income Statistics by Product</h3>
-            <table>
-                <tr><th>Product</th><th>Mean</th><th>Median</th><th>Std Dev</th></tr>
-                <tr><td>KP281</td><td>${:,.0f}</td><td>${:,.0f}</td><td>${:,.0f}</td></tr>
-                <tr><td>KP481</td><td>${:,.0f}</td><td>${:,.0f}</td><td>${:,.0f}</td></tr>
-                <tr><td>KP781</td><td>${:,.0f}</td><td>${:,.0f}</td><td>${:,.0f}</td></tr>
-            </table>
-        </div>
-        """.format(
-            income_stats.loc['KP281', 'mean'], income_stats.loc['KP281', 'median'], income_stats.loc['KP281', 'std'],
-            income_stats.loc['KP481', 'mean'], income_stats.loc['KP481', 'median'], income_stats.loc['KP481', 'std'],
-            income_stats.loc['KP781', 'mean'], income_stats.loc['KP781', 'median'], income_stats.loc['KP781', 'std']
+        income_stats = metrics.income_stats
+        st.markdown(stats_table_html(
+            income_stats, 'Income Statistics by Product', ('${:,.0f}', '${:,.0f}', '${:,.0f}')
         ), unsafe_allow_html=True)
         
         # Income Distribution
         fig = create_box_plot(
-            df,
+            version,
             x='Product',
             y='Income',
             title="Income Distribution by Product"
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, theme=None, config=_CFG)
         
         # Product Pricing
-        product_prices = {
-            'KP281': 1500,
-            'KP481': 1750,
-            'KP781': 2500
-        }
-        price_data = pd.DataFrame({
-            'Product': list(product_prices.keys()),
-            'Price': list(product_prices.values())
-        })
         fig = create_bar_chart(
-            price_data,
+            metrics.product_prices_df,
             x='Product',
             y='Price',
-            title="Product Price Points ($)"
+            title="Product Price Points ($)",
+            **_STATIC_SIZE
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=False, theme=None, config=_STATIC_CFG)
     
     with col2:
         # Income vs Age Analysis
-        fig = create_scatter_plot(
-            df,
-            x='Age',
-            y='Income',
-            title="Income vs Age Distribution",
-            color='Product'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        if len(df) > _DENSITY_ROWS:
+            fig = create_density_heatmap(version, x='Age', y='Income', title="Income vs Age Distribution")
+        else:
+            fig = create_scatter_plot(
+                version,
+                x='Age',
+                y='Income',
+                title="Income vs Age Distribution",
+                color='Product'
+            )
+        st.plotly_chart(fig, use_container_width=True, theme=None, config=_CFG)
         
         # Market Share Analysis
-        market_share = df['Product'].value_counts(normalize=True) * 100
-        st.markdown("""
+        market_share = metrics.market_share.to_dict()
+        st.markdown(f"""
         <div class="insight-box">
             <h3>Market Share Analysis</h3>
             <table>
                 <tr><th>Product</th><th>Market Share</th></tr>
-                <tr><td>KP281</td><td>{:.1f}%</td></tr>
-                <tr><td>KP481</td><td>{:.1f}%</td></tr>
-                <tr><td>KP781</td><td>{:.1f}%</td></tr>
+                <tr><td>KP281</td><td>{market_share['KP281']:.1f}%</td></tr>
+                <tr><td>KP481</td><td>{market_share['KP481']:.1f}%</td></tr>
+                <tr><td>KP781</td><td>{market_share['KP781']:.1f}%</td></tr>
             </table>
         </div>
-        """.format(
-            market_share['KP281'],
-            market_share['KP481'],
-            market_share['KP781']
-        ), unsafe_allow_html=True)
+        """, unsafe_allow_html=True)
         
         # Financial Insights
-        st.markdown("""
+        income = income_stats.to_dict('index')
+        st.markdown(f"""
         <div class="insight-box">
             <h3>Financial Insights</h3>
             <ul>
                 <li>Clear income segmentation across product lines</li>
-                <li>KP781 targets high-income customers (${:,.0f} median income)</li>
+                <li>KP781 targets high-income customers (${income['KP781']['median']:,.0f} median income)</li>
                 <li>Price points strategically positioned for market segments</li>
                 <li>Market share distribution reflects pricing strategy</li>
             </ul>
         </div>
-        """.format(income_stats.loc['KP781', 'median']), unsafe_allow_html=True)
+        """, unsafe_allow_html=True)
 
-else:  # Recommendations
+def render_recommendations():
     st.title("Marketing Recommendations")
     
     # Marketing Recommendations
@@ -897,6 +1040,17 @@ else:  # Recommendations
     </div>
     """, unsafe_allow_html=True)
 
+# Render the section picked in the sidebar
+_RENDERERS = {
+    "Product Overview": render_overview,
+    "Customer Segments": render_segments,
+    "Target Audience Analysis": render_audience,
+    "Usage Analysis": render_usage,
+    "Financial Insights": render_financial,
+    "Recommendations": render_recommendations
+}
+_RENDERERS[section]()
+
 # Footer
 st.markdown("---")
 st.markdown("Dashboard created for AeroFit Market Analysis | Updated: 2024")